@@ -2,7 +2,7 @@
 FamilyTree: Builds and manages a family tree using PersonFactory.
 Generates family relationships across multiple generations within a time range.
 """
-from collections import defaultdict, Counter
+from collections import Counter, deque
 
 
 class FamilyTree:
@@ -17,6 +17,9 @@ class FamilyTree:
         self.end_year = end_year
         self.roots = []   # Initial couple: [root1, root2]
         self.people = []  # All Person objects in the tree
+        # Running query counts, kept in sync by add_people()
+        self.decade_counts = Counter()  # Birth decade → number of people
+        self.name_counts = Counter()    # Full name → number of people
 
     def create_initial_couple(self):
         """
@@ -32,13 +35,17 @@ class FamilyTree:
         p1.add_partner(p2)
 
         self.roots = [p1, p2]
-        self.people = [p1, p2]
+        self.people = []
+        self.decade_counts = Counter()
+        self.name_counts = Counter()
+        self.add_people([p1, p2])
         return p1, p2
 
     def build(self):
         """
         Build the entire family tree using breadth-first traversal.
-        Processes each person: creates partner if needed, then generates children.
+        Each couple is processed exactly once, as soon as it is formed: its
+        children are generated immediately and only the children are queued.
         Continues until all eligible people have been processed up to end_year.
         """
         # Initialize roots if not already created
@@ -47,31 +54,47 @@ class FamilyTree:
         else:
             p1, p2 = self.roots[0], self.roots[1]
 
-        # Breadth-first queue: process people in order of birth
-        queue = [p1, p2]
+        # Breadth-first queue of unpartnered people, in order of birth
+        queue = deque()
+        self.process_couple(p1, p2, queue)
 
         while queue:
-            person = queue.pop(0)
-            partner = person.partner
+            person = queue.popleft()
 
-            # Create partner probabilistically if none exists
-            if partner is None and self.factory.has_partner(person):
+            # Create partner probabilistically, then generate the couple's children
+            if person.partner is None and self.factory.has_partner(person):
                 partner = self.factory.create_partner(person)
-                self.people.append(partner)
-                queue.append(partner)
-
-            # Generate children only once per couple (process elder parent)
-            # This prevents duplicate child generation
-            if partner is not None and person.birth_year <= partner.birth_year:
-                kids = self.factory.create_children(person, partner, self.end_year)
-                for child in kids:
-                    # Double-check end_year constraint (defensive programming)
-                    if child.birth_year <= self.end_year:
-                        self.people.append(child)
-                        queue.append(child)
+                self.add_people([partner])
+                self.process_couple(person, partner, queue)
 
         return self.people
 
+    def process_couple(self, person, partner, queue):
+        """
+        Generate children for a couple and queue them for processing.
+        Called once per couple, so no child set is ever generated twice.
+        """
+        # Elder parent first: their birth decade sets the number of children
+        if partner.birth_year < person.birth_year:
+            person, partner = partner, person
+        kids = self.factory.create_children(person, partner, self.end_year)
+        # Double-check end_year constraint (defensive programming)
+        kids = [child for child in kids if child.birth_year <= self.end_year]
+
+        # Add the whole sibling group at once
+        self.add_people(kids)
+        queue.extend(kids)
+
+    def add_people(self, people):
+        """
+        Record new people in the tree and update the running query counts,
+        so T/D/N queries never need to rescan self.people.
+        """
+        self.people.extend(people)
+        for p in people:
+            self.decade_counts[(p.birth_year // 10) * 10] += 1
+            self.name_counts[p.full_name] += 1
+
     # ----------------- QUERIES (menu) -----------------
     def total_people(self):
         """Return total number of people in the family tree."""
@@ -80,23 +103,21 @@ class FamilyTree:
     def total_people_by_decade(self):
         """
         Count people by birth decade.
-        Returns dict mapping decade → count, sorted by decade.
+        Returns Counter mapping decade → count (unordered; sort when displaying).
         """
-        counts = defaultdict(int)
-        for p in self.people:
-            decade = (p.birth_year // 10) * 10
-            counts[decade] += 1
-        return dict(sorted(counts.items()))
+        # Counted incrementally by add_people; copy so callers can't skew it
+        return Counter(self.decade_counts)
 
     def duplicate_full_names(self):
         """
         Find duplicate full names (first + last) in the tree.
         Returns dict mapping name → count, sorted by count (desc) then name (asc).
         """
-        names = [p.get_full_name() for p in self.people]
-        c = Counter(names)
-        dups = {name: cnt for name, cnt in c.items() if cnt > 1}
-        return dict(sorted(dups.items(), key=lambda x: (-x[1], x[0])))
+        c = self.name_counts  # Counted incrementally by add_people
+        # Sort only the duplicated names, not every unique name
+        dups = [(name, cnt) for name, cnt in c.items() if cnt > 1]
+        dups.sort(key=lambda x: (-x[1], x[0]))
+        return dict(dups)
 
     def run_cli(self):
         """
@@ -123,7 +144,7 @@ class FamilyTree:
 
             if cmd == "D":
                 counts = self.total_people_by_decade()
-                for decade, cnt in counts.items():
+                for decade, cnt in sorted(counts.items()):
                     print(f"{decade}s: {cnt}")
                 continue
 
@@ -4,19 +4,25 @@ class Person:
     Tracks partner and children relationships for family tree construction.
     """
 
+    # Fixed attribute set: no per-instance __dict__ for the many Persons in a tree
+    __slots__ = ("first_name", "last_name", "birth_year", "death_year", "gender",
+                 "partner", "children_list", "full_name")
+
     def __init__(self, first_name, last_name, birth_year, death_year, gender):
         self.first_name = first_name
         self.last_name = last_name
         self.birth_year = birth_year
         self.death_year = death_year
         self.gender = gender
+        # Built once here so name queries don't re-concatenate per call
+        self.full_name = first_name + " " + last_name
 
         # Family relationships
         self.partner = None
         self.children_list = []
 
     def get_full_name(self):
-        return self.first_name + " " + self.last_name
+        return self.full_name
 
     def get_age(self):
         """Calculate age at death. Returns None if person is still alive."""
@@ -35,10 +41,13 @@ class Person:
         self.children_list.append(child)
 
     def add_partner(self, partner):
-        """Establish bidirectional partner relationship."""
+        """
+        Establish bidirectional partner relationship.
+        Also sets partner.partner = self, so call this once per couple.
+        """
         self.partner = partner
         partner.partner = self   # link both people
 
     def __str__(self):
         """String representation: "First Last (birth_year - death_year)"."""
-        return self.get_full_name() + " (" + str(self.birth_year) + " - " + str(self.death_year) + ")"
+        return f"{self.full_name} ({self.birth_year} - {self.death_year})"
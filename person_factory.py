@@ -2,8 +2,11 @@
 PersonFactory: Generates realistic Person objects with names, birth/death years,
 and family relationships based on historical demographic data.
 """
+import bisect
 import csv
 import random
+import sys
+from itertools import accumulate
 from person import Person
 
 
@@ -21,9 +24,13 @@ class PersonFactory:
         self.rates_by_decade = {}
 
         # First name data keyed by (decade, gender)
-        # Format: {(decade, gender): ([names], [weights])}
+        # Format: {(decade, gender): ([names], [cumulative weights], total weight)}
         self.first_names = {}
 
+        # Available first-name keys per decade (for missing-gender fallback)
+        # Format: {decade: [(decade, gender), ...]}
+        self.first_name_keys_by_decade = {}
+
         # List of tuples: (last_name, rank)
         self.last_names = []
 
@@ -33,6 +40,7 @@ class PersonFactory:
         # Prepared lists for fast sampling
         self.last_name_choices = []
         self.last_name_weights = None  # None = uniform random
+        self.last_name_cum_weights = None  # Running totals of last_name_weights
 
     # ---------- READ FILES ----------
     def read_files(self):
@@ -40,6 +48,9 @@ class PersonFactory:
         print("Reading CSV files...")
         self.life_exp_by_decade = self.read_life_expectancy("life_expectancy.csv")
         self.first_names = self.read_firstnames("first_names.csv")
+        self.first_name_keys_by_decade = {}
+        for key in self.first_names:
+            self.first_name_keys_by_decade.setdefault(key[0], []).append(key)
         self.last_names = self.read_lastnames("last_names.csv")
         self.rank_prob = self.read_rank_probabilities("rank_to_probability.csv")
         self.rates_by_decade = self.read_birth_marriage_rates("birth_and_marriage_rates.csv")
@@ -55,6 +66,23 @@ class PersonFactory:
         """Return the decade of a year (e.g., 1987 → 1980)."""
         return (year // 10) * 10
 
+    def csv_reader(self, file):
+        """
+        Return a csv.reader over an open file, positioned after its header row.
+        The header is detected once per file with csv.Sniffer instead of
+        being checked row by row.
+        """
+        sample = file.read(4096)
+        file.seek(0)
+        reader = csv.reader(file)
+        try:
+            if sample and csv.Sniffer().has_header(sample):
+                next(reader, None)
+        except csv.Error:
+            # Sniffer could not determine the format: assume no header
+            pass
+        return reader
+
     def read_life_expectancy(self, filename):
         """
         Read life expectancy CSV.
@@ -63,21 +91,10 @@ class PersonFactory:
         """
         data = {}
         with open(filename) as file:
-            reader = csv.reader(file)
-            first = True
-            for row in reader:
+            for row in self.csv_reader(file):
                 if not row:
                     continue
 
-                # Skip header row if present (check if first column is not a decade)
-                if first:
-                    first = False
-                    try:
-                        _ = self.parse_decade(row[0])
-                    except:
-                        # If parsing fails, this is likely a header row
-                        continue
-
                 decade = self.parse_decade(row[0])
                 life_exp = float(row[1])
                 data[decade] = life_exp
@@ -87,45 +104,49 @@ class PersonFactory:
         """
         Read first name frequencies by decade and gender.
         Expected format: decade, gender, name, frequency
-        Returns dict mapping (decade, gender) → ([names], [weights]).
+        Returns dict mapping (decade, gender) → ([names], [cumulative weights], total).
         """
         data = {}
+        buckets = {}  # Raw (decade, gender) text → (names, weights) in data
         with open(filename) as file:
-            reader = csv.reader(file)
-            first = True
-            for row in reader:
+            for row in self.csv_reader(file):
                 if not row:
                     continue
 
-                # Skip header if present
-                if first:
-                    first = False
-                    if str(row[0]).lower().strip() in ["decade", "decades"]:
-                        continue
-
-                decade = self.parse_decade(row[0])
-
-                # Normalize gender to "M" or "F" format
-                gender_raw = str(row[1]).strip().lower()
-                if gender_raw == "female":
-                    gender = "F"
-                elif gender_raw == "male":
-                    gender = "M"
-                else:
-                    # Keep original format if not standard
-                    gender = str(row[1]).strip()
-
-                name = str(row[2]).strip()
-                freq = float(row[3])
-
-                key = (decade, gender)
-
-                # Store names and weights separately for weighted random selection
-                if key not in data:
-                    data[key] = ([], [])
-                names, weights = data[key]
-                names.append(name)
-                weights.append(freq)
+                # Rows are grouped by a few (decade, gender) pairs: parse each
+                # raw pair once and reuse its bucket for the remaining rows
+                bucket = buckets.get((row[0], row[1]))
+                if bucket is None:
+                    decade = self.parse_decade(row[0])
+
+                    # Normalize gender to "M" or "F" format
+                    gender_raw = str(row[1]).strip().lower()
+                    if gender_raw == "female":
+                        gender = "F"
+                    elif gender_raw == "male":
+                        gender = "M"
+                    else:
+                        # Keep original format if not standard
+                        gender = str(row[1]).strip()
+
+                    key = (decade, gender)
+
+                    # Store names and weights separately for weighted random selection
+                    if key not in data:
+                        data[key] = ([], [])
+                    bucket = data[key]
+                    buckets[(row[0], row[1])] = bucket
+
+                # Intern so every Person with this name shares one string object
+                names, weights = bucket
+                names.append(sys.intern(str(row[2]).strip()))
+                weights.append(float(row[3]))
+
+        # Each bucket is fixed after loading: precompute running totals once
+        # so every draw is a binary search instead of a fresh cumulative sum
+        for key, (names, weights) in data.items():
+            cum = list(accumulate(weights))
+            data[key] = (names, cum, cum[-1])
 
         return data
 
@@ -133,64 +154,85 @@ class PersonFactory:
         """
         Read last names and their ranks from CSV.
         Handles multiple CSV formats: DictReader with "name"/"rank" or "last_name"/"rank",
-        or fallback parsing for non-standard formats.
+        or non-standard formats whose columns are detected from the first data row.
         Returns list of tuples: [(last_name, rank), ...]
         """
         data = []
         with open(filename) as file:
             reader = csv.DictReader(file)
+            fields = reader.fieldnames or []
+
+            # Standard column names: "name"/"rank" or "last_name"/"rank"
+            if "name" in fields and "rank" in fields:
+                cols = ("name", "rank")
+            elif "last_name" in fields and "rank" in fields:
+                cols = ("last_name", "rank")
+            else:
+                cols = None  # Detect from the first data row
+            per_row = False  # True if detection failed: detect on every row
+
             for row in reader:
                 if not row:
                     continue
 
-                # Handle standard column names: "name" and "rank"
-                if "name" in row and "rank" in row:
-                    name = str(row["name"]).strip()
-                    rank = int(str(row["rank"]).strip())
-                    data.append((name, rank))
-                    continue
+                if cols is None and not per_row:
+                    cols = self.find_lastname_columns(row)
+                    if None in cols:
+                        cols = None
+                        per_row = True
 
-                # Handle alternative column names: "last_name" and "rank"
-                if "last_name" in row and "rank" in row:
-                    name = str(row["last_name"]).strip()
-                    rank = int(str(row["rank"]).strip())
-                    data.append((name, rank))
+                # Fast path: columns known, parse by direct indexing
+                if cols is not None:
+                    name_col, rank_col = cols
+                    data.append((sys.intern(row[name_col].strip()), int(row[rank_col])))
                     continue
 
-                # Fallback parsing if format is non-standard
-                # Extract all values and try to identify rank and name
-                values = [str(v).strip() for v in row.values()]
-
-                rank = None
-                name = None
-
-                # Find rank (first integer value found)
-                for v in values:
-                    try:
-                        rank = int(v)
-                        break
-                    except:
-                        pass
-
-                # Find name (first non-empty, non-numeric value)
-                for v in values:
-                    # Skip decade strings like "1980s"
-                    if v.endswith("s") and v[:-1].isdigit():
-                        continue
-                    # Skip numeric values
-                    if v.isdigit():
-                        continue
-                    # Use first non-empty string as name
-                    if v != "":
-                        name = v
-                        break
-
+                # Fallback: locate name and rank separately in each row
+                name_col, rank_col = self.find_lastname_columns(row)
                 # Only add if both name and rank were found
-                if name is not None and rank is not None:
+                if name_col is not None and rank_col is not None:
+                    name = sys.intern(str(row[name_col]).strip())
+                    rank = int(str(row[rank_col]).strip())
                     data.append((name, rank))
 
         return data
 
+    def find_lastname_columns(self, row):
+        """
+        Identify the name and rank columns of a non-standard last-names row.
+        Rank = first integer value; name = first non-empty, non-numeric value
+        that is not a decade string like "1980s".
+        Returns (name_col, rank_col); either is None if not found.
+        """
+        values = [(col, str(v).strip()) for col, v in row.items()]
+
+        rank_col = None
+        name_col = None
+
+        # Find rank (first integer value found)
+        for col, v in values:
+            try:
+                int(v)
+                rank_col = col
+                break
+            except:
+                pass
+
+        # Find name (first non-empty, non-numeric value)
+        for col, v in values:
+            # Skip decade strings like "1980s"
+            if v.endswith("s") and v[:-1].isdigit():
+                continue
+            # Skip numeric values
+            if v.isdigit():
+                continue
+            # Use first non-empty string as name
+            if v != "":
+                name_col = col
+                break
+
+        return name_col, rank_col
+
     def read_rank_probabilities(self, filename):
         """
         Read mapping from rank → probability.
@@ -247,6 +289,7 @@ class PersonFactory:
         if len(weights) == 0:
             self.last_name_choices = [name for (name, rank) in self.last_names]
             self.last_name_weights = None
+            self.last_name_cum_weights = None
             return
 
         # Check if all weights are zero (invalid distribution)
@@ -254,12 +297,15 @@ class PersonFactory:
         if total == 0:
             self.last_name_choices = [name for (name, rank) in self.last_names]
             self.last_name_weights = None
+            self.last_name_cum_weights = None
             return
 
         # Normalize weights to sum to 1.0 for proper probability distribution
         weights = [w / total for w in weights]
         self.last_name_choices = choices
         self.last_name_weights = weights
+        # Precompute running totals once so each draw is a binary search
+        self.last_name_cum_weights = list(accumulate(weights))
 
     def read_birth_marriage_rates(self, filename):
         """
@@ -269,18 +315,10 @@ class PersonFactory:
         """
         data = {}
         with open(filename) as file:
-            reader = csv.reader(file)
-            first = True
-            for row in reader:
+            for row in self.csv_reader(file):
                 if not row:
                     continue
 
-                # Skip header row if present
-                if first:
-                    first = False
-                    if str(row[0]).lower().strip() in ["decade", "decades"]:
-                        continue
-
                 decade = self.parse_decade(row[0])
                 birth_rate = float(row[1])
                 marriage_rate = float(row[2])
@@ -302,7 +340,8 @@ class PersonFactory:
 
     def random_gender(self):
         """Randomly return 'M' or 'F'."""
-        return random.choice(["M", "F"])
+        # One random bit per call: no list allocation, no state kept on the factory
+        return "F" if random.getrandbits(1) else "M"
 
     def generate_year_died(self, year_born):
         """
@@ -336,14 +375,14 @@ class PersonFactory:
 
         # Fallback if exact gender missing: use any available gender for that decade
         if key not in self.first_names:
-            possible = [k for k in self.first_names.keys() if k[0] == decade]
+            possible = self.first_name_keys_by_decade.get(decade)
             if not possible:
                 raise ValueError("No first names available for decade " + str(decade))
             key = random.choice(possible)
 
         # Use weighted random selection based on name frequencies
-        names, weights = self.first_names[key]
-        return random.choices(names, weights=weights, k=1)[0]
+        names, cum, total = self.first_names[key]
+        return names[bisect.bisect(cum, random.random() * total, 0, len(cum) - 1)]
 
     def generate_last_name(self):
         """
@@ -355,7 +394,8 @@ class PersonFactory:
             # Uniform random selection (all names equally likely)
             return random.choice(self.last_name_choices)
         # Weighted random selection based on rank probabilities
-        return random.choices(self.last_name_choices, weights=self.last_name_weights, k=1)[0]
+        cum = self.last_name_cum_weights
+        return self.last_name_choices[bisect.bisect(cum, random.random() * cum[-1], 0, len(cum) - 1)]
 
     def create_partner(self, person):
         """
@@ -371,9 +411,8 @@ class PersonFactory:
             year = 1950
 
         partner = self.create_person(year)
-        # Establish bidirectional relationship
+        # Establish bidirectional relationship (add_partner links both sides)
         person.add_partner(partner)
-        partner.add_partner(person)
         return partner
 
     def number_of_children(self, person):
@@ -394,23 +433,39 @@ class PersonFactory:
 
         return random.randint(low, high)
 
-    def create_person_with_family_name(self, year_born, last1, last2):
+    def generate_family_years(self, elder_birth, count, end_year=2120):
         """
-        Create a child person choosing last name from either parent.
-        Randomly selects one of the two parent last names.
-        Generates random gender and appropriate first name.
+        Compute birth and death years for all of a couple's children in one pass.
+        Children are evenly spaced across ages 25–45 of the elder parent with
+        small random jitter; years after end_year are dropped.
+        Returns (birth_years, death_years) as parallel lists.
         """
-        gender = self.random_gender()
-        first = self.generate_first_name(year_born, gender)
-        # Randomly inherit last name from either parent
-        last = random.choice([last1, last2])
-        died = self.generate_year_died(year_born)
-        return Person(first, last, year_born, died, gender)
+        # Typical fertility window: ages 25-45
+        start = elder_birth + 25
+        end = elder_birth + 45
+
+        # Generate evenly spaced birth years across the fertility window
+        if count == 1:
+            # Single child: random year in window
+            years = [random.randint(start, end)]
+        else:
+            # Multiple children: evenly spaced with small random jitter (±1 year),
+            # clamped to the valid range
+            step = (end - start) / (count - 1)
+            uniform = random.uniform
+            years = [min(max(int(round(start + step * i + uniform(-1, 1))), start), end)
+                     for i in range(count)]
+
+        # Skip children that would be born after the cutoff year
+        years = [y for y in years if y <= end_year]
+
+        deaths = [self.generate_year_died(y) for y in years]
+        return years, deaths
 
     def create_children(self, parent1, parent2, end_year=2120):
         """
         Generate children for a couple, spaced between ages 25–45 of elder parent.
-        Children are evenly spaced across the fertility window with small random jitter.
+        Birth and death years come from generate_family_years in a single call.
         Skips children that would be born after end_year.
         Establishes parent-child relationships bidirectionally.
         """
@@ -422,44 +477,21 @@ class PersonFactory:
 
         # Elder parent = smaller birth year (determines fertility window)
         elder_birth = min(parent1.birth_year, parent2.birth_year)
-        # Typical fertility window: ages 25-45
-        start = elder_birth + 25
-        end = elder_birth + 45
-
-        years = []
-
-        # Generate evenly spaced birth years across the fertility window
-        if count == 1:
-            # Single child: random year in window
-            years = [random.randint(start, end)]
-        else:
-            # Multiple children: evenly spaced with small random jitter
-            step = (end - start) / (count - 1)
-            for i in range(count):
-                y = start + step * i
-                # Add small random jitter (±1 year) for realism
-                y = int(round(y + random.uniform(-1, 1)))
+        years, deaths = self.generate_family_years(elder_birth, count, end_year)
 
-                # Clamp to valid range
-                if y < start:
-                    y = start
-                if y > end:
-                    y = end
-
-                years.append(y)
+        # Draw every sibling's gender and inherited last name up front:
+        # one getrandbits call per couple instead of two random.choice per child
+        gender_bits = random.getrandbits(count)
+        parent_bits = random.getrandbits(count)
+        parent_last_names = (parent1.last_name, parent2.last_name)
 
         # Create child Person objects
-        for year in years:
-            # Skip if child would be born after cutoff year
-            if year > end_year:
-                continue
-
-            # Create child with random gender and inherited last name
-            child = self.create_person_with_family_name(
-                year,
-                parent1.last_name,
-                parent2.last_name
-            )
+        for i, (year, died) in enumerate(zip(years, deaths)):
+            # Bit i of each batch decides this child's gender and last name
+            gender = "F" if (gender_bits >> i) & 1 else "M"
+            last = parent_last_names[(parent_bits >> i) & 1]
+            first = self.generate_first_name(year, gender)
+            child = Person(first, last, year, died, gender)
 
             # Establish bidirectional parent-child relationships
             parent1.add_child(child)